@@ -278,6 +278,13 @@ async def delete_canvas(
                 detail="Canvas not found"
             )
         
+        # Only the creator or an admin may delete a canvas
+        if canvas.creator_id != current_user.id and not auth_service.is_user_admin(current_user):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only delete your own canvases"
+            )
+        
         # Soft delete
         canvas.is_active = False
         await db.commit()
@@ -12,7 +12,7 @@ from ...services.auth import auth_service
 from ...services.tile import tile_service
 from ...models.user import User
 from ...models.tile_lock import TileLock
-from ...schemas.tile_lock import TileLockResponse, TileLockCreate, TileLockUpdate
+from ...schemas.tile_lock import TileLockResponse, TileLockCreate, TileLockUpdate, TileLockStatus
 
 router = APIRouter()
 security = HTTPBearer()
@@ -100,7 +100,7 @@ async def extend_tile_lock(
         )
 
 
-@router.get("/{tile_id}/lock", response_model=TileLockResponse)
+@router.get("/{tile_id}/lock", response_model=TileLockStatus)
 async def get_tile_lock_status(
     tile_id: int,
     current_user: User = Depends(get_current_user),
@@ -15,6 +15,7 @@ from ...services.tile import tile_service
 from ...services.user import user_service
 from ...models.user import User
 from ...models.canvas import Canvas
+from ...models.tile import Tile
 from ...schemas.tile import TileResponse, TileUpdate, TileCreate, TileWithCreator
 from ...schemas.user import UserResponse
 
@@ -216,7 +217,9 @@ async def delete_tile(
         tile = await tile_service.delete_tile(db, tile_id, current_user)
         
         # Broadcast tile deletion to WebSocket clients
-        await connection_manager.broadcast_tile_deleted(tile.canvas_id, tile_id, current_user.id)
+        await connection_manager.broadcast_tile_deleted(
+            tile.canvas_id, tile_id, {"x": tile.x, "y": tile.y}, current_user.id
+        )
         
         return {"message": "Tile deleted successfully"}
         
@@ -322,7 +325,9 @@ async def like_tile(
                 await user_service.increment_likes_received(db, tile.creator_id)
             
             # Broadcast like to WebSocket clients
-            await connection_manager.broadcast_tile_liked(tile.canvas_id, tile_id, current_user.id)
+            await connection_manager.broadcast_tile_liked(
+                tile.canvas_id, tile_id, {"like_count": tile.like_count}, current_user.id
+            )
             
             return {
                 "message": "Tile liked successfully",
@@ -362,7 +367,9 @@ async def unlike_tile(
                 await user_service.decrement_likes_received(db, tile.creator_id)
             
             # Broadcast unlike to WebSocket clients
-            await connection_manager.broadcast_tile_unliked(tile.canvas_id, tile_id, current_user.id)
+            await connection_manager.broadcast_tile_unliked(
+                tile.canvas_id, tile_id, current_user.id, tile.like_count
+            )
             
             return {"message": "Tile unliked successfully"}
         else:
@@ -24,15 +24,23 @@ else:
     # Fallback to SQLite for development
     async_database_url = "sqlite+aiosqlite:///artparty_social.db"
 
+# Pool sizing only applies to PostgreSQL; SQLite's default pool rejects these arguments
+if async_database_url.startswith("sqlite"):
+    pool_settings = {}
+else:
+    pool_settings = {
+        "pool_pre_ping": True,
+        "pool_size": 5,  # Reduce pool size to prevent exhaustion
+        "max_overflow": 10,  # Reduce max overflow
+        "pool_timeout": 30,  # Add timeout for getting connections
+        "pool_recycle": 3600,  # Recycle connections every hour
+    }
+
 # Create ASYNC database engine with more conservative settings
 engine = create_async_engine(
     async_database_url,
     echo=settings.DEBUG,  # Log SQL statements in debug mode
-    pool_pre_ping=True,
-    pool_size=5,  # Reduce pool size to prevent exhaustion
-    max_overflow=10,  # Reduce max overflow
-    pool_timeout=30,  # Add timeout for getting connections
-    pool_recycle=3600,  # Recycle connections every hour
+    **pool_settings
 )
 
 # Create async sessionmaker
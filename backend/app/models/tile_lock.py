@@ -23,8 +23,11 @@ class TileLock(Base):
     
     def is_expired(self) -> bool:
         """Check if the lock has expired"""
-        # Use timezone-aware datetime for comparison
-        return datetime.now(timezone.utc) > self.expires_at
+        # Use timezone-aware datetime for comparison; SQLite hands back naive UTC values
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) > expires_at
     
     def extend_lock(self, minutes: int = 30):
         """Extend the lock expiration time"""
@@ -38,4 +38,5 @@ class TileLockStatus(BaseModel):
     locked_by_user_id: Optional[int] = None
     locked_by_username: Optional[str] = None
     expires_at: Optional[datetime] = None
-    can_acquire: bool 
\ No newline at end of file
+    can_acquire: bool
+    message: Optional[str] = None 
\ No newline at end of file
@@ -3,7 +3,8 @@ Verification service for email verification and password reset
 """
 import secrets
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timezone
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -17,6 +18,14 @@ from .password import password_service
 
 logger = logging.getLogger(__name__)
 
+# Token lifetimes in seconds, resolved once from settings at import time
+_EMAIL_VERIFICATION_EXPIRY_SECONDS = settings.VERIFICATION_TOKEN_EXPIRE_MINUTES * 60
+_PASSWORD_RESET_EXPIRY_SECONDS = settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES * 60
+_TOKEN_EXPIRY_SECONDS = {
+    "email_verification": _EMAIL_VERIFICATION_EXPIRY_SECONDS,
+    "password_reset": _PASSWORD_RESET_EXPIRY_SECONDS,
+}
+
 class VerificationService:
     """Service for handling email verification and password reset tokens"""
     
@@ -46,12 +55,11 @@ class VerificationService:
         
         # Set expiration time
         if expires_in_minutes is None:
-            if token_type == "email_verification":
-                expires_in_minutes = settings.VERIFICATION_TOKEN_EXPIRE_MINUTES
-            else:
-                expires_in_minutes = settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES
+            expires_in_seconds = _TOKEN_EXPIRY_SECONDS.get(token_type, _PASSWORD_RESET_EXPIRY_SECONDS)
+        else:
+            expires_in_seconds = expires_in_minutes * 60
         
-        expires_at = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
+        expires_at = datetime.fromtimestamp(time.time() + expires_in_seconds, tz=timezone.utc)
         
         # Create new token
         token = VerificationToken(
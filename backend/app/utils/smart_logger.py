@@ -5,6 +5,7 @@ import time
 import json
 from typing import Dict, List, Any, Optional
 from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -33,12 +34,14 @@ class Transaction:
     end_time: Optional[float] = None
     result: Optional[Any] = None
 
+# Transaction active in the current task/thread; nested transactions restore the outer one on exit
+_current_transaction: ContextVar[Optional[Transaction]] = ContextVar("smart_logger_transaction", default=None)
+
 class SmartLogger:
     """Intelligent logging system that combines related operations"""
     
     def __init__(self, verbose_mode: bool = False):
         self.verbose_mode = verbose_mode
-        self.active_transactions: Dict[str, Transaction] = {}
         self.settings = {
             'enable_grouping': True,
             'enable_transactions': True,
@@ -105,7 +108,7 @@ class SmartLogger:
             start_time=time.time()
         )
         
-        self.active_transactions[transaction_id] = transaction
+        token = _current_transaction.set(transaction)
         
         if self.verbose_mode:
             print(f"🔄 Starting: {title} {context}")
@@ -124,12 +127,11 @@ class SmartLogger:
             self._complete_transaction(transaction, success=False)
             raise
         finally:
-            if transaction_id in self.active_transactions:
-                del self.active_transactions[transaction_id]
+            _current_transaction.reset(token)
     
     def add_to_transaction(self, transaction_id: str, level: LogLevel, message: str, data: Any = None):
-        """Add a message to an active transaction"""
-        transaction = self.active_transactions.get(transaction_id)
+        """Add a message to the transaction active in the current context"""
+        transaction = _current_transaction.get()
         if not transaction:
             # Fallback to regular logging
             self.log(level, message, data)
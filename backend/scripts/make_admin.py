@@ -1,77 +1,114 @@
 #!/usr/bin/env python3
 """
-Script to make an existing user an admin
-Usage: python scripts/make_admin.py <username>
+Script to make existing users admins
+Usage: python scripts/make_admin.py <username> [<username> ...]
 """
 
 import sys
 import os
-from sqlalchemy.orm import Session
+from typing import List
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
 
 # Add the parent directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import SessionLocal, engine
+from app.core.config import settings
 from app.models.user import User
 
+# app.core.database only provides an async engine; this script runs synchronously, like init_db.py
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def make_user_admin(username: str):
-    """Make a user an admin"""
+# Indexed by bool(flag): False -> "❌", True -> "✅"
+STATUS_ICONS = ("❌", "✅")
+
+ADMIN_PERMISSIONS = {
+    "can_manage_users": True,
+    "can_manage_canvases": True,
+    "can_manage_tiles": True,
+    "can_view_reports": True,
+    "can_cleanup_data": True
+}
+
+
+def make_users_admin(usernames: List[str]) -> int:
+    """Make several users admins with a single UPDATE
+    
+    Returns how many users were updated, or -1 if the database update failed.
+    """
+    # Usernames are stored lowercase; drop repeats but keep the order they were given in
+    wanted = list(dict.fromkeys(username.lower() for username in usernames))
+    
     db = SessionLocal()
     try:
-        # Find the user
-        user = db.query(User).filter(User.username == username.lower()).first()
-        
-        if not user:
-            print(f"❌ User '{username}' not found")
-            return False
+        stmt = select(User.id, User.username, User.is_admin, User.is_superuser).where(User.username.in_(wanted))
+        found = {user.username: user for user in db.execute(stmt)}
         
-        print(f"🔍 Found user: {user.username} (ID: {user.id})")
-        print(f"📊 Current admin status: is_admin={user.is_admin}, is_superuser={user.is_superuser}")
+        for username in wanted:
+            user = found.get(username)
+            if user is None:
+                print(f"❌ User '{username}' not found")
+                continue
+            print(f"🔍 Found user: {user.username} (ID: {user.id})")
+            print(f"📊 Current admin status: is_admin={user.is_admin}, is_superuser={user.is_superuser}")
         
-        # Update to admin
-        user.is_admin = True
-        user.is_superuser = True
-        user.admin_permissions = {
-            "can_manage_users": True,
-            "can_manage_canvases": True,
-            "can_manage_tiles": True,
-            "can_view_reports": True,
-            "can_cleanup_data": True
-        }
+        if not found:
+            return 0
         
+        stmt = (
+            update(User)
+            .where(User.username.in_(list(found)))
+            .values(is_admin=True, is_superuser=True, admin_permissions=ADMIN_PERMISSIONS)
+        )
+        result = db.execute(stmt)
         db.commit()
-        db.refresh(user)
         
-        print(f"✅ User '{username}' is now an admin!")
-        print(f"📊 Updated admin status: is_admin={user.is_admin}, is_superuser={user.is_superuser}")
-        print(f"🔐 Admin permissions: {user.admin_permissions}")
+        if result.rowcount:
+            for username in found:
+                print(f"✅ User '{username}' is now an admin!")
+            print("📊 Updated admin status: is_admin=True, is_superuser=True")
+            print(f"🔐 Admin permissions: {ADMIN_PERMISSIONS}")
         
-        return True
+        return result.rowcount
         
     except Exception as e:
-        print(f"❌ Error making user admin: {e}")
+        print(f"❌ Error making users admin: {e}")
         db.rollback()
-        return False
+        return -1
     finally:
         db.close()
 
 
+def make_user_admin(username: str):
+    """Make a user an admin"""
+    return make_users_admin([username]) == 1
+
+
 def list_users():
     """List all users with their admin status"""
     db = SessionLocal()
     try:
-        users = db.query(User).all()
+        # Stream plain rows instead of loading every User into the identity map;
+        # without stream_results psycopg2 buffers the whole result client-side before yield_per sees it
+        stmt = (
+            select(User.id, User.username, User.email, User.is_admin, User.is_superuser)
+            .execution_options(stream_results=True)
+        )
+        result = db.execute(stmt).yield_per(1000)
         
         print("👥 All Users:")
         print("-" * 80)
         print(f"{'ID':<5} {'Username':<20} {'Email':<30} {'Admin':<8} {'Super':<8}")
         print("-" * 80)
         
-        for user in users:
-            admin_status = "✅" if user.is_admin else "❌"
-            super_status = "✅" if user.is_superuser else "❌"
-            print(f"{user.id:<5} {user.username:<20} {user.email:<30} {admin_status:<8} {super_status:<8}")
+        # One write per fetched batch rather than one print per user
+        for users in result.partitions():
+            sys.stdout.write("".join(
+                f"{user.id:<5} {user.username:<20} {user.email:<30} "
+                f"{STATUS_ICONS[bool(user.is_admin)]:<8} {STATUS_ICONS[bool(user.is_superuser)]:<8}\n"
+                for user in users
+            ))
         
         print("-" * 80)
         
@@ -83,14 +120,18 @@ def list_users():
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python scripts/make_admin.py <username>")
+        print("Usage: python scripts/make_admin.py <username> [<username> ...]")
         print("   or: python scripts/make_admin.py --list")
         sys.exit(1)
     
     if sys.argv[1] == "--list":
         list_users()
-    else:
+    elif len(sys.argv) == 2:
         username = sys.argv[1]
         success = make_user_admin(username)
         if not success:
             sys.exit(1)
+    else:
+        usernames = sys.argv[1:]
+        if make_users_admin(usernames) != len({username.lower() for username in usernames}):
+            sys.exit(1)
@@ -0,0 +1,25 @@
+"""
+Minimal FastAPI app for endpoint tests
+"""
+from fastapi import FastAPI
+
+from app.api.v1.auth import router as auth_router
+from app.api.v1.users import router as users_router
+from app.api.v1.canvas import router as canvas_router
+from app.api.v1.tiles import router as tiles_router
+from app.api.v1.tile_locks import router as tile_locks_router
+
+
+def make_test_app() -> FastAPI:
+    """Build an app with only the auth, user, canvas, tile and tile-lock routers mounted.
+
+    Skips app.main's lifespan (table creation) and middleware stack; prefixes
+    and slash handling match the production app so test URLs stay the same.
+    """
+    app = FastAPI(redirect_slashes=False)
+    app.include_router(auth_router, prefix="/api/v1/auth", tags=["authentication"])
+    app.include_router(users_router, prefix="/api/v1/users", tags=["users"])
+    app.include_router(canvas_router, prefix="/api/v1/canvas", tags=["canvas"])
+    app.include_router(tiles_router, prefix="/api/v1/tiles", tags=["tiles"])
+    app.include_router(tile_locks_router, prefix="/api/v1/tile-locks", tags=["tile-locks"])
+    return app
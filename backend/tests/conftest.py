@@ -0,0 +1,269 @@
+"""
+Shared test configuration
+
+Runs before any test module imports the app, so settings read at import
+time pick up the environment set here.
+
+The endpoint test modules share one database setup: each module gets its own
+in-memory SQLite database holding an outer transaction for the rows the module
+seeds, and every test runs inside a SAVEPOINT that is rolled back afterwards.
+"""
+import asyncio
+import hashlib
+import os
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+os.environ["ENVIRONMENT"] = "test"
+os.environ["DEBUG"] = "true"
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite://"
+
+USER1_DATA = {
+    "username": "user1",
+    "email": "user1@example.com",
+    "password": "SecurePass123!",
+    "first_name": "User",
+    "last_name": "One"
+}
+USER2_DATA = {
+    "username": "user2",
+    "email": "user2@example.com",
+    "password": "SecurePass123!",
+    "first_name": "User",
+    "last_name": "Two"
+}
+USER3_DATA = {
+    "username": "user3",
+    "email": "user3@example.com",
+    "password": "SecurePass123!",
+    "first_name": "User",
+    "last_name": "Three"
+}
+TEST_USERS = (USER1_DATA, USER2_DATA, USER3_DATA)
+
+# Every session joins the module connection's transaction, so commits made by
+# the endpoints only release a SAVEPOINT and can still be rolled back
+TestingSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    join_transaction_mode="create_savepoint"
+)
+
+
+def _fast_hash(password):
+    """Cheap stand-in for bcrypt"""
+    return "test$" + hashlib.sha256(password.encode()).hexdigest()
+
+
+def _auth_header(user):
+    """Authorization header for user, signed directly rather than via /login"""
+    from app.services.auth import auth_service
+
+    token = auth_service.create_access_token({"sub": user.username, "user_id": user.id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """Swap the auth and password services' bcrypt hashing for _fast_hash for the whole run"""
+    # Imported here so the app is only loaded after the test modules have been collected
+    from app.services.auth import AuthService
+    from app.services.password import PasswordService
+
+    with pytest.MonkeyPatch.context() as mp:
+        for service in (AuthService, PasswordService):
+            mp.setattr(service, "hash_password", lambda self, password: _fast_hash(password))
+            mp.setattr(
+                service,
+                "verify_password",
+                lambda self, plain_password, hashed_password: _fast_hash(plain_password) == hashed_password
+            )
+        yield
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """One event loop per module so the module-scoped database fixtures and client can share it"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def test_engine():
+    """Create the module's in-memory SQLite engine with every table the endpoints under test use"""
+    from app.core.database import Base
+    from app.models import User, Canvas, Tile, Like, VerificationToken, TileLock
+
+    # StaticPool hands every checkout the same connection and so the same database.
+    # Under pytest-xdist each worker process gets its own private copy.
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        query_cache_size=1200
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # pysqlite's implicit BEGIN handling breaks SAVEPOINTs; let SQLAlchemy emit BEGIN itself
+        dbapi_connection.isolation_level = None
+        # Journal and sync settings do nothing for one in-memory connection; temp tables can stay in memory too
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # The chat models use Postgres-only UUID columns, so they are left out
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[
+                User.__table__,
+                Canvas.__table__,
+                Tile.__table__,
+                Like.__table__,
+                VerificationToken.__table__,
+                TileLock.__table__
+            ]
+        )
+
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def db_connection(test_engine):
+    """Open the module's connection, whose outer transaction holds the rows the module seeds"""
+    async with test_engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            yield connection
+        finally:
+            await transaction.rollback()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_db(db_connection):
+    """Session for seeding module-wide rows; each test's SAVEPOINT undoes changes made to them"""
+    session = TestingSessionLocal(bind=db_connection)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@pytest_asyncio.fixture
+async def test_db(db_connection):
+    """Open this test's SAVEPOINT and a session inside it; both are rolled back after the test"""
+    savepoint = await db_connection.begin_nested()
+    session = TestingSessionLocal(bind=db_connection)
+    try:
+        yield session
+    finally:
+        await session.close()
+        if savepoint.is_active:
+            await savepoint.rollback()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def module_client(db_connection):
+    """Create one in-process client for the module, with get_db routed through the module connection"""
+    from app.core.database import get_db
+    from _app_factory import make_test_app
+
+    app = make_test_app()
+    # Every request shares the one connection, so overlapping requests queue for it one at a time
+    session_lock = asyncio.Lock()
+
+    async def override_get_db():
+        async with session_lock:
+            db = TestingSessionLocal(bind=db_connection)
+            try:
+                yield db
+            finally:
+                await db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    # ASGITransport calls the app directly on the test's event loop, no portal thread
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(module_client, test_db):
+    """Hand out the module's client with this test's SAVEPOINT open"""
+    # Headers are passed per request, so cookies are the only state the client carries over
+    module_client.cookies.clear()
+    return module_client
+
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded_users(module_db):
+    """Insert user1, user2 and user3 once per module, keyed by username"""
+    from app.models import User
+    from app.services.auth import auth_service
+
+    # All three share a password, so hash it once
+    hashed_password = auth_service.hash_password(USER1_DATA["password"])
+
+    users = [
+        User(
+            username=user_data["username"],
+            email=user_data["email"],
+            hashed_password=hashed_password,
+            first_name=user_data["first_name"],
+            last_name=user_data["last_name"]
+        )
+        for user_data in TEST_USERS
+    ]
+    module_db.add_all(users)
+    await module_db.commit()
+
+    return {user.username: user for user in users}
+
+
+@pytest.fixture(scope="module")
+def user1(seeded_users):
+    """The seeded user1 row, owner of the canvases and tiles the tests set up"""
+    return seeded_users[USER1_DATA["username"]]
+
+
+@pytest.fixture(scope="module")
+def user2(seeded_users):
+    """The seeded user2 row"""
+    return seeded_users[USER2_DATA["username"]]
+
+
+@pytest.fixture(scope="module")
+def user3(seeded_users):
+    """The seeded user3 row"""
+    return seeded_users[USER3_DATA["username"]]
+
+
+@pytest.fixture(scope="module")
+def headers1(user1):
+    """Authorization header for user1"""
+    return _auth_header(user1)
+
+
+@pytest.fixture(scope="module")
+def headers2(user2):
+    """Authorization header for user2"""
+    return _auth_header(user2)
+
+
+@pytest.fixture(scope="module")
+def headers3(user3):
+    """Authorization header for user3"""
+    return _auth_header(user3)
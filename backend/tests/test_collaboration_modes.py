@@ -2,103 +2,41 @@
 Test Collaboration Mode Functionality
 """
 import pytest
-import httpx
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import tempfile
-import os
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 
-from app.main import app
-from app.core.database import Base, get_db
-from app.models.user import User
-from app.models.canvas import Canvas
-from app.models.tile import Tile
-from app.models.tile_lock import TileLock
-from app.services.auth import AuthService
+from factories import make_canvas, make_tile, pixel_grid
 
+pytestmark = pytest.mark.asyncio
 
-# Test database setup
-@pytest.fixture(scope="session")
-def test_engine():
-    """Create test database engine"""
-    # Use in-memory SQLite for tests
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    Base.metadata.create_all(bind=engine)
-    return engine
+RESTRICTED_MODE_DETAILS = {
+    "tile-lock": "tile lock mode",
+    "area-lock": "area lock mode",
+    "review": "review mode"
+}
+RESTRICTED_MODES = list(RESTRICTED_MODE_DETAILS)
 
+# Full-size payload for the factory canvases' 64px tiles, differing from the factory's white tiles
+UPDATED_PIXEL_DATA = pixel_grid(color="#000000")
 
-@pytest.fixture(scope="function")
-def test_db(test_engine):
-    """Create test database session"""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    
-    # Create all tables
-    Base.metadata.create_all(bind=test_engine)
-    
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
-        # Clean up tables
-        Base.metadata.drop_all(bind=test_engine)
-        Base.metadata.create_all(bind=test_engine)
 
+def lock_url(tile_id):
+    """Tile lock endpoint for tile_id"""
+    return f"/api/v1/tile-locks/{tile_id}/lock"
 
-@pytest.fixture(scope="function")
-def client(test_db):
-    """Create test client"""
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    app.dependency_overrides.clear()
+
+def parse_utc(timestamp):
+    """Parse an ISO timestamp from a response, reading naive values as UTC like the API stores them"""
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
 
 
 class TestCollaborationModes:
     """Test collaboration mode functionality"""
     
-    def setup_method(self):
-        """Setup test data"""
-        self.user1_data = {
-            "username": "user1",
-            "email": "user1@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "One"
-        }
-        self.user2_data = {
-            "username": "user2", 
-            "email": "user2@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "Two"
-        }
-        self.user3_data = {
-            "username": "user3",
-            "email": "user3@example.com", 
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "Three"
-        }
-    
-    def create_user(self, client, user_data):
-        """Helper to create a user and return auth token"""
-        response = client.post("/api/v1/auth/register", json=user_data)
-        assert response.status_code == 201
-        return response.json()["access_token"]
-    
-    def create_canvas(self, client, token, collaboration_mode="free"):
-        """Helper to create a canvas with specified collaboration mode"""
+    async def create_canvas(self, client, headers, collaboration_mode="free", **overrides):
+        """Helper to create a canvas with specified collaboration mode; keyword arguments override fields"""
         canvas_data = {
             "name": f"Test Canvas - {collaboration_mode}",
             "description": f"Test canvas with {collaboration_mode} mode",
@@ -108,203 +46,111 @@ class TestCollaborationModes:
             "collaboration_mode": collaboration_mode,
             "is_public": True
         }
+        canvas_data.update(overrides)
         
-        headers = {"Authorization": f"Bearer {token}"}
-        response = client.post("/api/v1/canvas/", json=canvas_data, headers=headers)
-        assert response.status_code == 201
-        return response.json()
-    
-    def create_tile(self, client, token, canvas_id, x=0, y=0):
-        """Helper to create a tile"""
-        tile_data = {
-            "canvas_id": canvas_id,
-            "x": x,
-            "y": y,
-            "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
-        }
-        
-        headers = {"Authorization": f"Bearer {token}"}
-        response = client.post("/api/v1/tiles/", json=tile_data, headers=headers)
+        response = await client.post("/api/v1/canvas/", json=canvas_data, headers=headers)
         assert response.status_code == 201
-        return response.json()
+        return response.json()["canvas"]
     
-    def test_free_mode_any_user_can_edit_any_tile(self, client):
+    async def test_free_mode_any_user_can_edit_any_tile(self, client, test_db, user1, headers2):
         """Test that in free mode, any user can edit any tile"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
         # Create canvas in free mode
-        canvas = self.create_canvas(client, token1, "free")
+        canvas = await make_canvas(test_db, user1.id, "free")
         
         # User1 creates a tile
-        tile = self.create_tile(client, token1, canvas["id"])
+        tile = await make_tile(test_db, canvas.id, user1.id)
         
         # User2 should be able to edit User1's tile in free mode
         update_data = {
-            "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
+            "pixel_data": UPDATED_PIXEL_DATA
         }
         
-        headers = {"Authorization": f"Bearer {token2}"}
-        response = client.put(f"/api/v1/tiles/{tile['id']}", json=update_data, headers=headers)
+        response = await client.put(f"/api/v1/tiles/{tile.id}", json=update_data, headers=headers2)
         
         assert response.status_code == 200
-        updated_tile = response.json()
+        updated_tile = response.json()["tile"]
         assert updated_tile["pixel_data"] == update_data["pixel_data"]
-        assert updated_tile["creator_id"] == self.user1_data["username"]  # Creator remains the same
-    
-    def test_tile_lock_mode_only_creator_can_edit(self, client):
-        """Test that in tile-lock mode, only the creator can edit their tiles"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
-        # Create canvas in tile-lock mode
-        canvas = self.create_canvas(client, token1, "tile-lock")
-        
-        # User1 creates a tile
-        tile = self.create_tile(client, token1, canvas["id"])
-        
-        # User2 should NOT be able to edit User1's tile in tile-lock mode
-        update_data = {
-            "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
-        }
-        
-        headers = {"Authorization": f"Bearer {token2}"}
-        response = client.put(f"/api/v1/tiles/{tile['id']}", json=update_data, headers=headers)
-        
-        assert response.status_code == 403
-        assert "tile lock mode" in response.json()["detail"].lower()
-    
-    def test_area_lock_mode_only_creator_can_edit(self, client):
-        """Test that in area-lock mode, only the creator can edit their tiles"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
-        # Create canvas in area-lock mode
-        canvas = self.create_canvas(client, token1, "area-lock")
-        
-        # User1 creates a tile
-        tile = self.create_tile(client, token1, canvas["id"])
-        
-        # User2 should NOT be able to edit User1's tile in area-lock mode
-        update_data = {
-            "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
-        }
-        
-        headers = {"Authorization": f"Bearer {token2}"}
-        response = client.put(f"/api/v1/tiles/{tile['id']}", json=update_data, headers=headers)
-        
-        assert response.status_code == 403
-        assert "area lock mode" in response.json()["detail"].lower()
+        assert updated_tile["creator_id"] == user1.id  # Creator remains the same
     
-    def test_review_mode_only_creator_can_edit(self, client):
-        """Test that in review mode, only the creator can edit their tiles"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
-        # Create canvas in review mode
-        canvas = self.create_canvas(client, token1, "review")
+    @pytest.mark.parametrize("mode", RESTRICTED_MODES)
+    async def test_restricted_mode_only_creator_can_edit(self, client, test_db, user1, headers2, mode):
+        """Test that in restricted modes, only the creator can edit their tiles"""
+        # Create canvas in the restricted mode
+        canvas = await make_canvas(test_db, user1.id, mode)
         
         # User1 creates a tile
-        tile = self.create_tile(client, token1, canvas["id"])
+        tile = await make_tile(test_db, canvas.id, user1.id)
         
-        # User2 should NOT be able to edit User1's tile in review mode
+        # User2 should NOT be able to edit User1's tile
         update_data = {
-            "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
+            "pixel_data": UPDATED_PIXEL_DATA
         }
         
-        headers = {"Authorization": f"Bearer {token2}"}
-        response = client.put(f"/api/v1/tiles/{tile['id']}", json=update_data, headers=headers)
+        response = await client.put(f"/api/v1/tiles/{tile.id}", json=update_data, headers=headers2)
         
         assert response.status_code == 403
-        assert "review mode" in response.json()["detail"].lower()
+        assert RESTRICTED_MODE_DETAILS[mode] in response.json()["detail"].lower()
     
-    def test_creator_can_always_edit_own_tiles(self, client):
+    async def test_creator_can_always_edit_own_tiles(self, client, test_db, user1, headers1):
         """Test that creators can always edit their own tiles regardless of mode"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
         # Test all collaboration modes
         modes = ["free", "tile-lock", "area-lock", "review"]
         
         for mode in modes:
             # Create canvas in current mode
-            canvas = self.create_canvas(client, token1, mode)
+            canvas = await make_canvas(test_db, user1.id, mode)
             
             # User1 creates a tile
-            tile = self.create_tile(client, token1, canvas["id"])
+            tile = await make_tile(test_db, canvas.id, user1.id)
             
             # User1 should be able to edit their own tile
             update_data = {
-                "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
+                "pixel_data": UPDATED_PIXEL_DATA
             }
             
-            headers = {"Authorization": f"Bearer {token1}"}
-            response = client.put(f"/api/v1/tiles/{tile['id']}", json=update_data, headers=headers)
+            response = await client.put(f"/api/v1/tiles/{tile.id}", json=update_data, headers=headers1)
             
             assert response.status_code == 200, f"Failed in {mode} mode"
-            updated_tile = response.json()
+            updated_tile = response.json()["tile"]
             assert updated_tile["pixel_data"] == update_data["pixel_data"]
     
-    def test_tile_locking_in_free_mode(self, client):
+    async def test_tile_locking_in_free_mode(self, client, test_db, user1, headers1, headers2):
         """Test that tile locking still works in free mode for concurrent editing protection"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
         # Create canvas in free mode
-        canvas = self.create_canvas(client, token1, "free")
+        canvas = await make_canvas(test_db, user1.id, "free")
         
         # User1 creates a tile
-        tile = self.create_tile(client, token1, canvas["id"])
+        tile = await make_tile(test_db, canvas.id, user1.id)
         
         # User1 acquires lock
-        headers1 = {"Authorization": f"Bearer {token1}"}
-        lock_response1 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers1)
+        lock_response1 = await client.post(lock_url(tile.id), headers=headers1)
         assert lock_response1.status_code == 200
         
         # User2 tries to acquire lock (should fail)
-        headers2 = {"Authorization": f"Bearer {token2}"}
-        lock_response2 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers2)
+        lock_response2 = await client.post(lock_url(tile.id), headers=headers2)
         assert lock_response2.status_code == 409
         assert "being edited by another user" in lock_response2.json()["detail"]
     
-    def test_tile_locking_in_restricted_modes(self, client):
+    @pytest.mark.parametrize("mode", RESTRICTED_MODES)
+    async def test_tile_locking_in_restricted_modes(self, client, test_db, user1, headers1, headers2, mode):
         """Test that tile locking works in restricted modes and respects permissions"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
+        # Create canvas in the restricted mode
+        canvas = await make_canvas(test_db, user1.id, mode)
         
-        # Test restricted modes
-        modes = ["tile-lock", "area-lock", "review"]
+        # User1 creates a tile
+        tile = await make_tile(test_db, canvas.id, user1.id)
         
-        for mode in modes:
-            # Create canvas in current mode
-            canvas = self.create_canvas(client, token1, mode)
-            
-            # User1 creates a tile
-            tile = self.create_tile(client, token1, canvas["id"])
-            
-            # User1 should be able to acquire lock
-            headers1 = {"Authorization": f"Bearer {token1}"}
-            lock_response1 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers1)
-            assert lock_response1.status_code == 200, f"Failed in {mode} mode"
-            
-            # User2 should NOT be able to acquire lock (permission denied)
-            headers2 = {"Authorization": f"Bearer {token2}"}
-            lock_response2 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers2)
-            assert lock_response2.status_code == 403, f"Failed in {mode} mode"
-            assert mode.replace("-", " ") in lock_response2.json()["detail"].lower()
+        # User1 should be able to acquire lock
+        lock_response1 = await client.post(lock_url(tile.id), headers=headers1)
+        assert lock_response1.status_code == 200
+        
+        # User2 should NOT be able to acquire lock (permission denied)
+        lock_response2 = await client.post(lock_url(tile.id), headers=headers2)
+        assert lock_response2.status_code == 403
+        assert RESTRICTED_MODE_DETAILS[mode] in lock_response2.json()["detail"].lower()
     
-    def test_canvas_collaboration_mode_validation(self, client):
+    async def test_canvas_collaboration_mode_validation(self, client, headers1):
         """Test that canvas creation validates collaboration mode values"""
-        token = self.create_user(client, self.user1_data)
-        headers = {"Authorization": f"Bearer {token}"}
-        
         # Valid modes
         valid_modes = ["free", "tile-lock", "area-lock", "review"]
         for mode in valid_modes:
@@ -314,7 +160,7 @@ class TestCollaborationModes:
                 "collaboration_mode": mode,
                 "is_public": True
             }
-            response = client.post("/api/v1/canvas/", json=canvas_data, headers=headers)
+            response = await client.post("/api/v1/canvas/", json=canvas_data, headers=headers1)
             assert response.status_code == 201, f"Failed for mode: {mode}"
         
         # Invalid mode
@@ -324,71 +170,61 @@ class TestCollaborationModes:
             "collaboration_mode": "invalid-mode",
             "is_public": True
         }
-        response = client.post("/api/v1/canvas/", json=canvas_data, headers=headers)
+        response = await client.post("/api/v1/canvas/", json=canvas_data, headers=headers1)
         assert response.status_code == 422  # Validation error
     
-    def test_canvas_update_collaboration_mode(self, client):
+    async def test_canvas_update_collaboration_mode(self, client, test_db, user1, headers1):
         """Test that canvas collaboration mode can be updated"""
-        token = self.create_user(client, self.user1_data)
-        headers = {"Authorization": f"Bearer {token}"}
-        
         # Create canvas in free mode
-        canvas = self.create_canvas(client, token, "free")
+        canvas = await make_canvas(test_db, user1.id, "free")
         
         # Update to tile-lock mode
         update_data = {"collaboration_mode": "tile-lock"}
-        response = client.put(f"/api/v1/canvas/{canvas['id']}", json=update_data, headers=headers)
+        response = await client.put(f"/api/v1/canvas/{canvas.id}", json=update_data, headers=headers1)
         assert response.status_code == 200
         
-        updated_canvas = response.json()
+        updated_canvas = response.json()["canvas"]
         assert updated_canvas["collaboration_mode"] == "tile-lock"
     
-    def test_multiple_users_can_create_tiles_in_free_mode(self, client):
+    async def test_multiple_users_can_create_tiles_in_free_mode(
+        self, client, user1, user2, user3, headers1, headers2, headers3
+    ):
         """Test that multiple users can create tiles in free mode"""
-        # Create users
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        token3 = self.create_user(client, self.user3_data)
-        
         # Create canvas in free mode
-        canvas = self.create_canvas(client, token1, "free")
+        canvas = await self.create_canvas(client, headers1, "free")
         
         # All users should be able to create tiles
         users = [
-            (token1, self.user1_data["username"]),
-            (token2, self.user2_data["username"]),
-            (token3, self.user3_data["username"])
+            (headers1, user1),
+            (headers2, user2),
+            (headers3, user3)
         ]
         
-        for token, username in users:
+        for position, (headers, user) in enumerate(users):
             tile_data = {
                 "canvas_id": canvas["id"],
-                "x": len(users),  # Different positions
-                "y": len(users),
-                "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+                "x": position,  # Different positions
+                "y": position,
+                "pixel_data": pixel_grid()
             }
             
-            headers = {"Authorization": f"Bearer {token}"}
-            response = client.post("/api/v1/tiles/", json=tile_data, headers=headers)
-            assert response.status_code == 201, f"Failed for user: {username}"
+            response = await client.post("/api/v1/tiles/", json=tile_data, headers=headers)
+            assert response.status_code == 201, f"Failed for user: {user.username}"
             
-            tile = response.json()
-            assert tile["creator_id"] == username
+            tile = response.json()["tile"]
+            assert tile["creator_id"] == user.id
     
-    def test_tile_creation_limits_respected(self, client):
+    async def test_tile_creation_limits_respected(self, client, headers1):
         """Test that tile creation limits are respected regardless of collaboration mode"""
-        token = self.create_user(client, self.user1_data)
-        headers = {"Authorization": f"Bearer {token}"}
-        
         # Create canvas with low tile limit
-        canvas_data = {
-            "name": "Test Canvas - Limited",
-            "description": "Test canvas with tile limits",
-            "max_tiles_per_user": 2,
-            "collaboration_mode": "free",
-            "is_public": True
-        }
-        canvas = self.create_canvas(client, token, canvas_data)
+        canvas = await self.create_canvas(
+            client,
+            headers1,
+            "free",
+            name="Test Canvas - Limited",
+            description="Test canvas with tile limits",
+            max_tiles_per_user=2
+        )
         
         # Create 2 tiles (should succeed)
         for i in range(2):
@@ -396,9 +232,9 @@ class TestCollaborationModes:
                 "canvas_id": canvas["id"],
                 "x": i,
                 "y": i,
-                "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+                "pixel_data": pixel_grid()
             }
-            response = client.post("/api/v1/tiles/", json=tile_data, headers=headers)
+            response = await client.post("/api/v1/tiles/", json=tile_data, headers=headers1)
             assert response.status_code == 201, f"Failed to create tile {i+1}"
         
         # Try to create 3rd tile (should fail)
@@ -406,138 +242,84 @@ class TestCollaborationModes:
             "canvas_id": canvas["id"],
             "x": 2,
             "y": 2,
-            "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+            "pixel_data": pixel_grid()
         }
-        response = client.post("/api/v1/tiles/", json=tile_data, headers=headers)
-        assert response.status_code == 400
-        assert "tile limit" in response.json()["detail"].lower()
+        response = await client.post("/api/v1/tiles/", json=tile_data, headers=headers1)
+        assert response.status_code == 403
+        assert "tile limit reached" in response.json()["detail"].lower()
 
 
 class TestTileLockFunctionality:
     """Test tile locking functionality across collaboration modes"""
     
-    def setup_method(self):
-        """Setup test data"""
-        self.user1_data = {
-            "username": "user1",
-            "email": "user1@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "One"
-        }
-        self.user2_data = {
-            "username": "user2",
-            "email": "user2@example.com", 
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "Two"
-        }
-    
-    def create_user(self, client, user_data):
-        """Helper to create a user and return auth token"""
-        response = client.post("/api/v1/auth/register", json=user_data)
-        assert response.status_code == 201
-        return response.json()["access_token"]
-    
-    def create_canvas_and_tile(self, client, token, collaboration_mode="free"):
+    async def create_canvas_and_tile(self, db, owner_id, collaboration_mode="free"):
         """Helper to create a canvas and tile"""
-        canvas_data = {
-            "name": f"Test Canvas - {collaboration_mode}",
-            "description": "Test canvas",
-            "collaboration_mode": collaboration_mode,
-            "is_public": True
-        }
-        
-        headers = {"Authorization": f"Bearer {token}"}
-        canvas_response = client.post("/api/v1/canvas/", json=canvas_data, headers=headers)
-        assert canvas_response.status_code == 201
-        canvas = canvas_response.json()
-        
-        tile_data = {
-            "canvas_id": canvas["id"],
-            "x": 0,
-            "y": 0,
-            "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
-        }
-        
-        tile_response = client.post("/api/v1/tiles/", json=tile_data, headers=headers)
-        assert tile_response.status_code == 201
-        tile = tile_response.json()
-        
+        canvas = await make_canvas(db, owner_id, collaboration_mode)
+        tile = await make_tile(db, canvas.id, owner_id)
         return canvas, tile
     
-    def test_lock_acquisition_and_release(self, client):
+    async def test_lock_acquisition_and_release(self, client, test_db, user1, headers1):
         """Test basic lock acquisition and release"""
-        token = self.create_user(client, self.user1_data)
-        canvas, tile = self.create_canvas_and_tile(client, token)
-        
-        headers = {"Authorization": f"Bearer {token}"}
+        canvas, tile = await self.create_canvas_and_tile(test_db, user1.id)
         
         # Acquire lock
-        lock_response = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers)
+        lock_response = await client.post(lock_url(tile.id), headers=headers1)
         assert lock_response.status_code == 200
         lock_data = lock_response.json()
-        assert "lock_id" in lock_data
+        assert lock_data["tile_id"] == tile.id
+        assert lock_data["user_id"] == user1.id
+        assert lock_data["is_active"] is True
         assert "expires_at" in lock_data
         
         # Check lock status
-        status_response = client.get(f"/api/v1/tiles/{tile['id']}/lock", headers=headers)
+        status_response = await client.get(lock_url(tile.id), headers=headers1)
         assert status_response.status_code == 200
         status_data = status_response.json()
         assert status_data["is_locked"] == True
         assert status_data["can_acquire"] == False
         
         # Release lock
-        release_response = client.delete(f"/api/v1/tiles/{tile['id']}/lock", headers=headers)
+        release_response = await client.delete(lock_url(tile.id), headers=headers1)
         assert release_response.status_code == 200
         
         # Check lock status again
-        status_response = client.get(f"/api/v1/tiles/{tile['id']}/lock", headers=headers)
+        status_response = await client.get(lock_url(tile.id), headers=headers1)
         assert status_response.status_code == 200
         status_data = status_response.json()
         assert status_data["is_locked"] == False
         assert status_data["can_acquire"] == True
     
-    def test_concurrent_lock_acquisition(self, client):
+    async def test_concurrent_lock_acquisition(self, client, test_db, user1, headers1, headers2):
         """Test that only one user can acquire a lock at a time"""
-        token1 = self.create_user(client, self.user1_data)
-        token2 = self.create_user(client, self.user2_data)
-        
-        canvas, tile = self.create_canvas_and_tile(client, token1)
-        
-        headers1 = {"Authorization": f"Bearer {token1}"}
-        headers2 = {"Authorization": f"Bearer {token2}"}
+        canvas, tile = await self.create_canvas_and_tile(test_db, user1.id)
         
         # User1 acquires lock
-        lock_response1 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers1)
+        lock_response1 = await client.post(lock_url(tile.id), headers=headers1)
         assert lock_response1.status_code == 200
         
         # User2 tries to acquire lock (should fail)
-        lock_response2 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers2)
+        lock_response2 = await client.post(lock_url(tile.id), headers=headers2)
         assert lock_response2.status_code == 409
         assert "being edited by another user" in lock_response2.json()["detail"]
         
         # User1 releases lock
-        release_response = client.delete(f"/api/v1/tiles/{tile['id']}/lock", headers=headers1)
+        release_response = await client.delete(lock_url(tile.id), headers=headers1)
         assert release_response.status_code == 200
         
         # User2 can now acquire lock
-        lock_response2 = client.post(f"/api/v1/tiles/{tile['id']}/lock", headers=headers2)
+        lock_response2 = await client.post(lock_url(tile.id), headers=headers2)
         assert lock_response2.status_code == 200
     
-    def test_lock_expiration(self, client):
-        """Test that locks expire after the specified time"""
-        token = self.create_user(client, self.user1_data)
-        canvas, tile = self.create_canvas_and_tile(client, token)
-        
-        headers = {"Authorization": f"Bearer {token}"}
+    async def test_lock_expiration(self, client, test_db, user1, headers1):
+        """Test that locks are issued with the default 30 minute expiry"""
+        canvas, tile = await self.create_canvas_and_tile(test_db, user1.id)
         
-        # Acquire lock with short expiration (1 minute)
-        lock_response = client.post(f"/api/v1/tiles/{tile['id']}/lock?minutes=1", headers=headers)
+        # The lock endpoint takes no duration, so the service default applies
+        lock_response = await client.post(lock_url(tile.id), headers=headers1)
         assert lock_response.status_code == 200
         
         # Check lock status
-        status_response = client.get(f"/api/v1/tiles/{tile['id']}/lock", headers=headers)
+        status_response = await client.get(lock_url(tile.id), headers=headers1)
         assert status_response.status_code == 200
         status_data = status_response.json()
         assert status_data["is_locked"] == True
@@ -545,9 +327,7 @@ class TestTileLockFunctionality:
         # Note: In a real test, we would wait for expiration
         # For this test, we'll just verify the expiration time is set correctly
         lock_data = lock_response.json()
-        expires_at = datetime.fromisoformat(lock_data["expires_at"].replace('Z', '+00:00'))
-        now = datetime.utcnow().replace(tzinfo=expires_at.tzinfo)
-        time_diff = expires_at - now
+        time_diff = parse_utc(lock_data["expires_at"]) - datetime.now(timezone.utc)
         
-        # Should be approximately 1 minute (allow some tolerance)
-        assert 50 <= time_diff.total_seconds() <= 70 
\ No newline at end of file
+        # Should be approximately 30 minutes (allow some tolerance)
+        assert 29 * 60 <= time_diff.total_seconds() <= 30 * 60 + 10 
\ No newline at end of file
@@ -2,522 +2,288 @@
 Test Concurrent Editing and Tile Locking
 """
 import pytest
-import os
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-import tempfile
-from datetime import datetime, timedelta
-import time
-
-# Set test environment variables BEFORE importing app
-os.environ["ENVIRONMENT"] = "test"
-os.environ["DEBUG"] = "true"
-os.environ["DATABASE_URL"] = "sqlite:///:memory:"
-
-from app.main import app
-from app.core.database import Base, get_db
-# Import models to ensure they are registered with Base
-from app.models import User, Canvas, Tile, Like, VerificationToken, TileLock
-
-
-# Test database setup
-@pytest.fixture(scope="session")
-def test_engine():
-    """Create test database engine"""
-    # Force SQLite for tests
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
-    print(f"Creating test engine: {engine.url}")
-    
-    # Import models to ensure they are registered
-    from app.models import User, Canvas, Tile, Like, VerificationToken, TileLock
-    
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
-    print(f"Tables created: {[table.name for table in Base.metadata.sorted_tables]}")
-    return engine
-
-
-@pytest.fixture(scope="function")
-def test_db(test_engine):
-    """Create test database session"""
-    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
-    
-    # Create all tables
-    Base.metadata.create_all(bind=test_engine)
-    print(f"Tables in test_db fixture: {[table.name for table in Base.metadata.sorted_tables]}")
-    
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.close()
-        # Clean up tables
-        Base.metadata.drop_all(bind=test_engine)
-        Base.metadata.create_all(bind=test_engine)
-
-
-@pytest.fixture(scope="function")
-def client(test_db):
-    """Create test client with SQLite database override"""
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            pass
-    
-    # Override the database dependency
-    app.dependency_overrides[get_db] = override_get_db
-    
-    with TestClient(app) as test_client:
-        yield test_client
-    
-    # Clear the override
-    app.dependency_overrides.clear()
-
-
-class TestTileLocking:
-    """Test tile locking functionality"""
-    
-    def setup_method(self):
-        """Setup test data"""
-        self.user1_data = {
-            "username": "user1",
-            "email": "user1@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "One"
-        }
-        self.user2_data = {
-            "username": "user2",
-            "email": "user2@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "Two"
-        }
-        self.user3_data = {
-            "username": "user3",
-            "email": "user3@example.com",
-            "password": "SecurePass123!",
-            "first_name": "User",
-            "last_name": "Three"
-        }
-    
-    def create_users_and_canvas(self, client):
-        """Helper to create test users and canvas"""
-        # Create users
-        user1_response = client.post("/api/v1/auth/register", json=self.user1_data)
-        user2_response = client.post("/api/v1/auth/register", json=self.user2_data)
-        user3_response = client.post("/api/v1/auth/register", json=self.user3_data)
-        
-        assert user1_response.status_code == 201
-        assert user2_response.status_code == 201
-        assert user3_response.status_code == 201
-        
-        user1_token = user1_response.json()["access_token"]
-        user2_token = user2_response.json()["access_token"]
-        user3_token = user3_response.json()["access_token"]
-        
-        # Create canvas with user1
-        canvas_data = {
-            "name": "Test Canvas",
-            "width": 1000,
-            "height": 1000,
-            "tile_size": 32,
-            "max_tiles_per_user": 10,
-            "collaboration_mode": "tile-lock"
-        }
-        
-        canvas_response = client.post(
-            "/api/v1/canvas/",
-            json=canvas_data,
-            headers={"Authorization": f"Bearer {user1_token}"}
-        )
-        assert canvas_response.status_code == 201
-        canvas = canvas_response.json()
-        
-        # Create a tile with user1
-        tile_data = {
-            "canvas_id": canvas["id"],
-            "x": 0,
-            "y": 0,
-            "pixel_data": [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
-        }
-        
-        tile_response = client.post(
-            "/api/v1/tiles/",
-            json=tile_data,
-            headers={"Authorization": f"Bearer {user1_token}"}
-        )
-        assert tile_response.status_code == 201
-        tile = tile_response.json()
-        
-        return {
-            "user1_token": user1_token,
-            "user2_token": user2_token,
-            "user3_token": user3_token,
-            "canvas": canvas,
-            "tile": tile
-        }
-    
-    def test_acquire_tile_lock_success(self, client):
-        """Test successful tile lock acquisition"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert response.status_code == 200
-        result = response.json()
-        assert "lock_id" in result
-        assert result["tile_id"] == data["tile"]["id"]
-        assert "expires_at" in result
-        assert "Tile lock acquired successfully" in result["message"]
-    
-    def test_acquire_tile_lock_conflict(self, client):
-        """Test that second user cannot acquire lock when tile is already locked"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        response1 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert response1.status_code == 200
-        
-        # User2 tries to acquire same lock
-        response2 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        
-        assert response2.status_code == 409
-        assert "Tile is currently being edited by another user" in response2.json()["detail"]
-    
-    def test_release_tile_lock_success(self, client):
-        """Test successful tile lock release"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # User1 releases lock
-        release_response = client.delete(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert release_response.status_code == 200
-        assert "Tile lock released successfully" in release_response.json()["message"]
-    
-    def test_release_tile_lock_unauthorized(self, client):
-        """Test that user cannot release lock they don't own"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # User2 tries to release lock they don't own
-        release_response = client.delete(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        
-        assert release_response.status_code == 404
-        assert "No active lock found for this tile" in release_response.json()["detail"]
-    
-    def test_extend_tile_lock_success(self, client):
-        """Test successful tile lock extension"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # User1 extends lock
-        extend_response = client.put(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert extend_response.status_code == 200
-        assert "Tile lock extended successfully" in extend_response.json()["message"]
-    
-    def test_extend_tile_lock_unauthorized(self, client):
-        """Test that user cannot extend lock they don't own"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # User2 tries to extend lock they don't own
-        extend_response = client.put(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        
-        assert extend_response.status_code == 404
-        assert "No active lock found for this tile" in extend_response.json()["detail"]
-    
-    def test_get_tile_lock_status_unlocked(self, client):
-        """Test getting lock status for unlocked tile"""
-        data = self.create_users_and_canvas(client)
-        
-        # Check status of unlocked tile
-        response = client.get(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert response.status_code == 200
-        result = response.json()
-        assert result["is_locked"] == False
-        assert result["can_acquire"] == True
-        assert "Tile is available for editing" in result["message"]
-    
-    def test_get_tile_lock_status_locked_by_self(self, client):
-        """Test getting lock status when user owns the lock"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # Check status
-        response = client.get(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert response.status_code == 200
-        result = response.json()
-        assert result["is_locked"] == True
-        assert result["can_acquire"] == False
-        assert "You have the lock for this tile" in result["message"]
-        assert "locked_by_user_id" in result
-        assert "expires_at" in result
-    
-    def test_get_tile_lock_status_locked_by_other(self, client):
-        """Test getting lock status when tile is locked by another user"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire_response.status_code == 200
-        
-        # User2 checks status
-        response = client.get(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        
-        assert response.status_code == 200
-        result = response.json()
-        assert result["is_locked"] == True
-        assert result["can_acquire"] == False
-        assert "Tile is being edited by another user" in result["message"]
-        assert "locked_by_user_id" in result
-        assert "expires_at" in result
-    
-    def test_acquire_lock_after_release(self, client):
-        """Test that lock can be acquired after being released"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        acquire1_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert acquire1_response.status_code == 200
-        
-        # User1 releases lock
-        release_response = client.delete(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert release_response.status_code == 200
-        
-        # User2 can now acquire lock
-        acquire2_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        assert acquire2_response.status_code == 200
-    
-    def test_concurrent_lock_requests(self, client):
-        """Test multiple users trying to acquire lock simultaneously"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock
-        response1 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert response1.status_code == 200
-        
-        # User2 and User3 try to acquire same lock
-        response2 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        response3 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user3_token']}"}
-        )
-        
-        # Both should fail
-        assert response2.status_code == 409
-        assert response3.status_code == 409
-        assert "Tile is currently being edited by another user" in response2.json()["detail"]
-        assert "Tile is currently being edited by another user" in response3.json()["detail"]
-    
-    def test_lock_expiration_cleanup(self, client):
-        """Test that expired locks are cleaned up automatically"""
-        data = self.create_users_and_canvas(client)
-        
-        # User1 acquires lock with very short expiration (1 second)
-        response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert response.status_code == 200
-        
-        # Wait for lock to expire
-        time.sleep(2)
-        
-        # User2 should now be able to acquire lock
-        response2 = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        assert response2.status_code == 200
-    
-    def test_tile_not_found(self, client):
-        """Test lock operations on non-existent tile"""
-        data = self.create_users_and_canvas(client)
-        
-        # Try to acquire lock for non-existent tile
-        response = client.post(
-            "/api/v1/tile-locks/99999/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        
-        assert response.status_code == 404
-        assert "Tile not found" in response.json()["detail"]
-    
-    def test_unauthorized_access(self, client):
-        """Test lock operations without authentication"""
-        data = self.create_users_and_canvas(client)
-        
-        # Try to acquire lock without token
-        response = client.post(f"/api/v1/tile-locks/{data['tile']['id']}/lock")
-        
-        assert response.status_code == 401
-    
-    def test_multiple_tiles_same_user(self, client):
-        """Test that user can lock multiple tiles"""
-        data = self.create_users_and_canvas(client)
-        
-        # Create second tile
-        tile2_data = {
-            "canvas_id": data["canvas"]["id"],
-            "x": 1,
-            "y": 0,
-            "pixel_data": [[9, 8, 7], [6, 5, 4], [3, 2, 1]]
-        }
-        
-        tile2_response = client.post(
-            "/api/v1/tiles/",
-            json=tile2_data,
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert tile2_response.status_code == 201
-        tile2 = tile2_response.json()
-        
-        # User1 locks first tile
-        lock1_response = client.post(
-            f"/api/v1/tile-locks/{data['tile']['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert lock1_response.status_code == 200
-        
-        # User1 locks second tile
-        lock2_response = client.post(
-            f"/api/v1/tile-locks/{tile2['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert lock2_response.status_code == 200
-    
-    def test_collaboration_mode_restrictions(self, client):
-        """Test that tile locking respects collaboration mode restrictions"""
-        data = self.create_users_and_canvas(client)
-        
-        # Create canvas with free collaboration mode
-        free_canvas_data = {
-            "name": "Free Canvas",
-            "width": 1000,
-            "height": 1000,
-            "tile_size": 32,
-            "max_tiles_per_user": 10,
-            "collaboration_mode": "free"
-        }
-        
-        free_canvas_response = client.post(
-            "/api/v1/canvas/",
-            json=free_canvas_data,
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert free_canvas_response.status_code == 201
-        free_canvas = free_canvas_response.json()
-        
-        # Create tile on free canvas
-        free_tile_data = {
-            "canvas_id": free_canvas["id"],
-            "x": 0,
-            "y": 0,
-            "pixel_data": [[1, 1, 1], [1, 1, 1], [1, 1, 1]]
-        }
-        
-        free_tile_response = client.post(
-            "/api/v1/tiles/",
-            json=free_tile_data,
-            headers={"Authorization": f"Bearer {data['user1_token']}"}
-        )
-        assert free_tile_response.status_code == 201
-        free_tile = free_tile_response.json()
-        
-        # In free mode, any user should be able to acquire lock
-        lock_response = client.post(
-            f"/api/v1/tile-locks/{free_tile['id']}/lock",
-            headers={"Authorization": f"Bearer {data['user2_token']}"}
-        )
-        assert lock_response.status_code == 200
+from sqlalchemy import update
+from datetime import datetime, timedelta, timezone
+
+from app.models import TileLock
+
+from factories import make_canvas, make_tile
+
+pytestmark = pytest.mark.asyncio
+
+
+async def create_canvas_and_tile(db, owner_id, mode="tile-lock"):
+    """Helper to create a canvas with one tile, both owned by owner_id
+
+    Tests where another user takes the lock pass mode="free"; in the other
+    modes only the tile's creator may lock it.
+    """
+    canvas = await make_canvas(
+        db,
+        owner_id,
+        mode,
+        name="Test Canvas",
+        width=1000,
+        height=1000,
+        tile_size=32,
+        max_tiles_per_user=10
+    )
+    tile = await make_tile(db, canvas.id, owner_id, size=canvas.tile_size)
+    return canvas, tile
+
+
+async def test_acquire_tile_lock_success(client, test_db, user1, headers1):
+    """Test successful tile lock acquisition"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    
+    # User1 acquires lock
+    response = await client.post(
+        f"/api/v1/tile-locks/{tile.id}/lock",
+        headers=headers1
+    )
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["tile_id"] == tile.id
+    assert result["user_id"] == user1.id
+    assert result["is_active"] is True
+    assert "expires_at" in result
+
+
+@pytest.mark.parametrize("extra_users", [1, 2], ids=["one_other_user", "two_other_users"])
+async def test_acquire_tile_lock_conflict(client, test_db, user1, headers1, headers2, headers3, extra_users):
+    """Test that other users cannot acquire the lock while user1 holds it"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id, "free")
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    response1 = await client.post(lock_url, headers=headers1)
+    assert response1.status_code == 200
+    
+    # The other users try to acquire the same lock; each should fail
+    for headers in [headers2, headers3][:extra_users]:
+        response = await client.post(lock_url, headers=headers)
+        assert response.status_code == 409
+        assert "Tile is currently being edited by another user" in response.json()["detail"]
+
+
+async def test_release_tile_lock_success(client, test_db, user1, headers1):
+    """Test successful tile lock release"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire_response = await client.post(lock_url, headers=headers1)
+    assert acquire_response.status_code == 200
+    
+    # User1 releases lock
+    release_response = await client.delete(lock_url, headers=headers1)
+    
+    assert release_response.status_code == 200
+    assert "Tile lock released successfully" in release_response.json()["message"]
+
+
+@pytest.mark.parametrize("http_method", ["delete", "put"], ids=["release", "extend"])
+async def test_modify_tile_lock_unauthorized(client, test_db, user1, headers1, headers2, http_method):
+    """Test that user cannot release or extend a lock they don't own"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire_response = await client.post(lock_url, headers=headers1)
+    assert acquire_response.status_code == 200
+    
+    # User2 tries to release or extend lock they don't own
+    response = await getattr(client, http_method)(lock_url, headers=headers2)
+    
+    assert response.status_code == 404
+    assert "No active lock found for this tile" in response.json()["detail"]
+
+
+async def test_extend_tile_lock_success(client, test_db, user1, headers1):
+    """Test successful tile lock extension"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire_response = await client.post(lock_url, headers=headers1)
+    assert acquire_response.status_code == 200
+    
+    # User1 extends lock
+    extend_response = await client.put(lock_url, headers=headers1)
+    
+    assert extend_response.status_code == 200
+    assert "Tile lock extended successfully" in extend_response.json()["message"]
+
+
+async def test_get_tile_lock_status_unlocked(client, test_db, user1, headers1):
+    """Test getting lock status for unlocked tile"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    
+    # Check status of unlocked tile
+    response = await client.get(
+        f"/api/v1/tile-locks/{tile.id}/lock",
+        headers=headers1
+    )
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["is_locked"] == False
+    assert result["can_acquire"] == True
+    assert "Tile is available for editing" in result["message"]
+
+
+async def test_get_tile_lock_status_locked_by_self(client, test_db, user1, headers1):
+    """Test getting lock status when user owns the lock"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire_response = await client.post(lock_url, headers=headers1)
+    assert acquire_response.status_code == 200
+    
+    # Check status
+    response = await client.get(lock_url, headers=headers1)
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["is_locked"] == True
+    assert result["can_acquire"] == False
+    assert "You have the lock for this tile" in result["message"]
+    assert "locked_by_user_id" in result
+    assert "expires_at" in result
+
+
+async def test_get_tile_lock_status_locked_by_other(client, test_db, user1, headers1, headers2):
+    """Test getting lock status when tile is locked by another user"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire_response = await client.post(lock_url, headers=headers1)
+    assert acquire_response.status_code == 200
+    
+    # User2 checks status
+    response = await client.get(lock_url, headers=headers2)
+    
+    assert response.status_code == 200
+    result = response.json()
+    assert result["is_locked"] == True
+    assert result["can_acquire"] == False
+    assert "Tile is being edited by another user" in result["message"]
+    assert "locked_by_user_id" in result
+    assert "expires_at" in result
+
+
+async def test_acquire_lock_after_release(client, test_db, user1, headers1, headers2):
+    """Test that lock can be acquired after being released"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id, "free")
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    acquire1_response = await client.post(lock_url, headers=headers1)
+    assert acquire1_response.status_code == 200
+    
+    # User1 releases lock
+    release_response = await client.delete(lock_url, headers=headers1)
+    assert release_response.status_code == 200
+    
+    # User2 can now acquire lock
+    acquire2_response = await client.post(lock_url, headers=headers2)
+    assert acquire2_response.status_code == 200
+
+
+async def test_lock_expiration_cleanup(client, test_db, user1, headers1, headers2):
+    """Test that expired locks are cleaned up automatically"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id, "free")
+    lock_url = f"/api/v1/tile-locks/{tile.id}/lock"
+    
+    # User1 acquires lock
+    response = await client.post(lock_url, headers=headers1)
+    assert response.status_code == 200
+    
+    # Expire the lock by moving its deadline into the past rather than waiting it out
+    await test_db.execute(
+        update(TileLock)
+        .where(TileLock.tile_id == tile.id)
+        .values(expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+    )
+    await test_db.commit()
+    
+    # User2 should now be able to acquire lock
+    response2 = await client.post(lock_url, headers=headers2)
+    assert response2.status_code == 200
+
+
+async def test_tile_not_found(client, headers1):
+    """Test lock operations on non-existent tile"""
+    # Try to acquire lock for non-existent tile
+    response = await client.post(
+        "/api/v1/tile-locks/99999/lock",
+        headers=headers1
+    )
+    
+    assert response.status_code == 404
+    assert "Tile not found" in response.json()["detail"]
+
+
+async def test_unauthorized_access(client, test_db, user1):
+    """Test lock operations without authentication"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    
+    # Try to acquire lock without token; HTTPBearer rejects a missing header with 403
+    response = await client.post(f"/api/v1/tile-locks/{tile.id}/lock")
+    
+    assert response.status_code == 403
+
+
+async def test_multiple_tiles_same_user(client, test_db, user1, headers1):
+    """Test that user can lock multiple tiles"""
+    canvas, tile = await create_canvas_and_tile(test_db, user1.id)
+    
+    # Create second tile
+    tile2 = await make_tile(test_db, canvas.id, user1.id, x=1, y=0, size=canvas.tile_size)
+    
+    # User1 locks first tile
+    lock1_response = await client.post(
+        f"/api/v1/tile-locks/{tile.id}/lock",
+        headers=headers1
+    )
+    assert lock1_response.status_code == 200
+    
+    # User1 locks second tile
+    lock2_response = await client.post(
+        f"/api/v1/tile-locks/{tile2.id}/lock",
+        headers=headers1
+    )
+    assert lock2_response.status_code == 200
+
+
+async def test_collaboration_mode_restrictions(client, test_db, user1, headers2):
+    """Test that tile locking respects collaboration mode restrictions"""
+    # Create canvas with free collaboration mode
+    free_canvas = await make_canvas(
+        test_db,
+        user1.id,
+        "free",
+        name="Free Canvas",
+        width=1000,
+        height=1000,
+        tile_size=32,
+        max_tiles_per_user=10
+    )
+    
+    # Create tile on free canvas
+    free_tile = await make_tile(test_db, free_canvas.id, user1.id, size=free_canvas.tile_size)
+    
+    # In free mode, any user should be able to acquire lock
+    lock_response = await client.post(
+        f"/api/v1/tile-locks/{free_tile.id}/lock",
+        headers=headers2
+    )
+    assert lock_response.status_code == 200
 
 
 # Run tests
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"]) 
\ No newline at end of file
+    pytest.main([__file__, "-v", "-n", "auto"]) 
\ No newline at end of file